@@ -49,6 +49,12 @@ def parse_arguments():
     parser.add_argument(
         "--max_workers", type=int, default=5, help="Maximum number of parallel workers"
     )
+    parser.add_argument(
+        "--batch_size",
+        type=int,
+        default=1,
+        help="Number of initial artifacts to generate per LLM request",
+    )
 
     parser.add_argument(
         "--artifact_class",
@@ -112,6 +118,7 @@ if __name__ == "__main__":
             "num_generations": args.num_generations,
             "k_neighbors": args.k_neighbors,
             "max_workers": args.max_workers,
+            "batch_size": args.batch_size,
             "artifact_class": args.artifact_class,
             "evolution_mode": args.evolution_mode,
             "reasoning_effort": args.reasoning_effort,
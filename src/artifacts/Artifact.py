@@ -2,8 +2,13 @@ import os
 import json
 import time
 import uuid
+import logging
+import numpy as np
+import torch
 from typing import List, Optional, Dict, Any
 
+from src.models import image_embedder, text_embedder
+
 
 class Artifact:
     name = "Artifact"
@@ -22,6 +27,107 @@ class Artifact:
         """Generate a random artifact directly (no explicit idea) and render it"""
         raise NotImplementedError("Subclasses must implement this")
 
+    @classmethod
+    def create_batch_from_prompt(cls, prompt: str, output_dir: str, n: int, **kwargs):
+        """Generate n artifacts from the same prompt"""
+        return [cls.create_from_prompt(prompt, output_dir, **kwargs) for _ in range(n)]
+
     def render_phenotype(self, output_dir: str, **kwargs) -> Optional[str]:
         """Render the phenotype from the genome"""
         raise NotImplementedError("Subclasses must implement this")
+
+    def compact_genome(self, max_tokens: int = 400) -> str:
+        """Genome shortened for use as context in prompts (unchanged by default)"""
+        return self.genome
+
+    def compute_embedding(self) -> torch.Tensor:
+        """Compute (and cache) the embedding used for novelty search"""
+        raise NotImplementedError("Subclasses must implement this")
+
+    @classmethod
+    def compute_embeddings(cls, artifacts: List["Artifact"], batch_size: int = 64):
+        """Compute embeddings for many artifacts of this class"""
+        return [artifact.compute_embedding() for artifact in artifacts]
+
+    @staticmethod
+    def _embed_frames(artifacts: List["Artifact"], batch_size: int = 64):
+        """
+        Batch-embed artifacts whose phenome is a list of rendered frames.
+
+        Each embedding is the normalized concatenation of its frame embeddings.
+        Artifacts missing any frame (e.g. the shader failed to compile) are
+        skipped and keep embedding None.
+        """
+        pending = []
+        artifact_frames = []
+        for artifact in artifacts:
+            if artifact.embedding is not None:
+                continue
+            frames = artifact.phenome or []
+            missing = [path for path in frames if not os.path.exists(path)]
+            for frame_path in missing:
+                logging.warning(f"Frame path not found: {frame_path}")
+            if missing or not frames:
+                continue
+            pending.append(artifact)
+            artifact_frames.append(frames)
+
+        all_frames = [path for frames in artifact_frames for path in frames]
+        if all_frames:
+            frame_embeddings = image_embedder.embedImages(all_frames, batch_size)
+            per_artifact = frame_embeddings.split([len(f) for f in artifact_frames])
+            for artifact, embeddings in zip(pending, per_artifact):
+                # Concatenate frames, then normalize
+                artifact.embedding = torch.nn.functional.normalize(
+                    embeddings.reshape(-1), dim=0
+                )
+
+        return [artifact.embedding for artifact in artifacts]
+
+    @staticmethod
+    def _embed_genomes(artifacts: List["Artifact"], batch_size: int = 64):
+        """Batch-embed artifacts whose genome is text"""
+        pending = [a for a in artifacts if a.embedding is None]
+        for i in range(0, len(pending), batch_size):
+            batch = pending[i : i + batch_size]
+            embeddings = text_embedder.embedText([a.genome for a in batch])
+            for artifact, embedding in zip(batch, embeddings):
+                artifact.embedding = embedding
+        return [artifact.embedding for artifact in artifacts]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable record of the artifact (embedding is stored separately)"""
+        return {
+            "id": self.id,
+            "type": type(self).__name__,
+            "genome": self.genome,
+            "phenome": self.phenome,
+            "prompt": self.prompt,
+            "creation_time": self.creation_time,
+            "metadata": self.metadata,
+        }
+
+    def save_into(self, store):
+        """Append this artifact's record to a PopulationStore shard"""
+        store.append(self.to_dict())
+
+    def save_embedding(self, output_dir: str) -> str:
+        """Save the embedding as a float16 .npy sidecar in output_dir/embeddings"""
+        os.makedirs(os.path.join(output_dir, "embeddings"), exist_ok=True)
+        embedding_path = os.path.join(output_dir, f"embeddings/{self.id}.npy")
+        np.save(
+            embedding_path,
+            self.embedding.detach().cpu().numpy().astype(np.float16),
+        )
+        return embedding_path
+
+    @staticmethod
+    def load_embedding(embedding_path: str) -> torch.Tensor:
+        """
+        Memory-map a saved embedding and return it as a tensor without copying.
+
+        The tensor keeps the on-disk float16 dtype; consumers cast it when used
+        (the novelty code normalizes in float32). Copy-on-write mode keeps the
+        array writable for torch while never modifying the file.
+        """
+        return torch.from_numpy(np.load(embedding_path, mmap_mode="c"))
@@ -1,6 +1,6 @@
-import os
 import numpy as np
 import torch
+from typing import List
 
 
 from src.models import llm_client, defaultModel, text_embedder
@@ -38,11 +38,6 @@ class GaArtifact(Artifact):
         )
         artifact.genome = response.choices[0].message.content.strip()
 
-        os.makedirs(os.path.join(output_dir, "source"), exist_ok=True)
-        genome_path = os.path.join(output_dir, f"source/{artifact.id}.txt")
-        with open(genome_path, "w") as f:
-            f.write(artifact.genome)
-
         return artifact
 
     def compute_embedding(self) -> torch.Tensor:
@@ -54,3 +49,8 @@ class GaArtifact(Artifact):
 
         self.embedding = emb
         return self.embedding
+
+    @classmethod
+    def compute_embeddings(cls, artifacts: List[Artifact], batch_size: int = 64):
+        """Compute embeddings for many artifacts, embedding genomes in batches"""
+        return cls._embed_genomes(artifacts, batch_size)
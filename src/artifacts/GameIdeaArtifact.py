@@ -1,7 +1,7 @@
 import os
 import json
-import numpy as np
 import torch
+from typing import List
 
 
 from src.models import text_embedder, llm_client, defaultModel
@@ -31,7 +31,9 @@ class GameIdeaArtifact(Artifact):
         artifact = cls()
         artifact.id = id
         artifact.genome = open(os.path.join(results_dir, f"ideas/{id}.txt")).read()
-        artifact.embedding = np.load(os.path.join(results_dir, f"embeddings/{id}.npy"))
+        artifact.embedding = cls.load_embedding(
+            os.path.join(results_dir, f"embeddings/{id}.npy")
+        )
         return artifact
 
     @classmethod
@@ -57,9 +59,7 @@ class GameIdeaArtifact(Artifact):
             f.write(artifact.genome)
 
         artifact.compute_embedding()
-        os.makedirs(os.path.join(output_dir, "embeddings"), exist_ok=True)
-        embedding_path = os.path.join(output_dir, f"embeddings/{artifact.id}.npy")
-        np.save(embedding_path, artifact.embedding.cpu().numpy())
+        artifact.save_embedding(output_dir)
 
         return artifact
 
@@ -71,6 +71,11 @@ class GameIdeaArtifact(Artifact):
         self.embedding = text_embedder.embedText(self.genome)[0]
         return self.embedding
 
+    @classmethod
+    def compute_embeddings(cls, artifacts: List[Artifact], batch_size: int = 64):
+        """Compute embeddings for many artifacts, embedding genomes in batches"""
+        return cls._embed_genomes(artifacts, batch_size)
+
     def post_process(self, output_dir: str, **kwargs):
         rules = """
         - Must be a p5.js game in a single html file
@@ -1,9 +1,8 @@
 import os
 import logging
-import numpy as np
 from enum import Enum
 import torch
-from typing import Optional
+from typing import List, Optional
 
 from src.models import llm_client, image_embedder, make_image
 from src.artifacts.Artifact import Artifact
@@ -67,15 +66,7 @@ class ImageGenArtifact(Artifact):
         artifact.render_phenotype(os.path.join(output_dir, "images"), **kwargs)
         artifact.compute_embedding()
 
-        os.makedirs(os.path.join(output_dir, "prompts"), exist_ok=True)
-        prompt_path = os.path.join(output_dir, f"prompts/{artifact.id}.txt")
-        with open(prompt_path, "w") as f:
-            f.write(imagePrompt)
-
-        # if self.embedding is not None:
-        os.makedirs(os.path.join(output_dir, "embeddings"), exist_ok=True)
-        embedding_path = os.path.join(output_dir, f"embeddings/{artifact.id}.npy")
-        np.save(embedding_path, artifact.embedding.cpu().numpy())
+        artifact.save_embedding(output_dir)
 
         return artifact
 
@@ -100,3 +91,15 @@ class ImageGenArtifact(Artifact):
         image_emb = image_embedder.embedImage(self.phenome)
         self.embedding = image_emb
         return self.embedding
+
+    @classmethod
+    def compute_embeddings(cls, artifacts: List[Artifact], batch_size: int = 64):
+        """Compute embeddings for many artifacts, embedding images in batches"""
+        pending = [a for a in artifacts if a.embedding is None]
+        if pending:
+            embeddings = image_embedder.embedImages(
+                [a.phenome for a in pending], batch_size
+            )
+            for artifact, embedding in zip(pending, embeddings):
+                artifact.embedding = embedding
+        return [artifact.embedding for artifact in artifacts]
@@ -1,6 +1,5 @@
 import os
 import math
-import numpy as np
 import torch
 import logging
 from typing import List, Dict, Any, Optional, Union
@@ -140,25 +139,11 @@ class SdfArtifact(Artifact):
         artifact.genome = response.choices[0].message.content.strip()
         # print(response.choices[0].message.content.strip())
 
-        os.makedirs(os.path.join(output_dir, "source"), exist_ok=True)
-        genome_path = os.path.join(output_dir, f"source/{artifact.id}.txt")
-        with open(genome_path, "w") as f:
-            f.write(artifact.genome)
-
         os.makedirs(os.path.join(output_dir, "images"), exist_ok=True)
         artifact.render_phenotype(os.path.join(output_dir, "images"), **kwargs)
         artifact.compute_embedding()
 
-        # if self.embedding is not None:
-        os.makedirs(os.path.join(output_dir, "embeddings"), exist_ok=True)
-        embedding_path = os.path.join(output_dir, f"embeddings/{artifact.id}.npy")
-        np.save(embedding_path, artifact.embedding.cpu().numpy())
-
-        # Save prompt to output dir
-        os.makedirs(os.path.join(output_dir, "prompts"), exist_ok=True)
-        prompt_path = os.path.join(output_dir, f"prompts/{artifact.id}.txt")
-        with open(prompt_path, "w") as f:
-            f.write(prompt)
+        artifact.save_embedding(output_dir)
 
         return artifact
 
@@ -181,3 +166,8 @@ class SdfArtifact(Artifact):
         normalized = torch.nn.functional.normalize(concat_embedding, dim=0)
         self.embedding = normalized
         return self.embedding
+
+    @classmethod
+    def compute_embeddings(cls, artifacts: List[Artifact], batch_size: int = 64):
+        """Compute embeddings for many artifacts, batching all of their frames"""
+        return cls._embed_frames(artifacts, batch_size)
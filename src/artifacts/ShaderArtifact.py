@@ -1,14 +1,20 @@
 import os
+import re
+import shutil
+import hashlib
 import logging
-import numpy as np
+import threading
 from enum import Enum
 import torch
 from typing import List, Dict, Any, Optional, Union
+from concurrent.futures import ThreadPoolExecutor
 
 from src.shaderToImage import shader_to_image
 from src.models import llm_client, image_embedder
-from src.utils import extractCode
+from src.utils import extractCode, compact_shader, streamUntilCode
+from src import llm_cache
 from src.artifacts.Artifact import Artifact
+from src.artifacts.glsl_reference import glslReference
 
 defaultModel = "openai:o3-mini"
 
@@ -23,6 +29,89 @@ void main() {
 }
 """
 
+def _log_prompt_cache(usage):
+    # The system prompt is a stable prefix, so repeats should hit the cache
+    details = getattr(usage, "prompt_tokens_details", None)
+    if details is not None:
+        logging.debug(
+            f"Prompt tokens: {usage.prompt_tokens}, cached: {details.cached_tokens}"
+        )
+
+
+def _drain_stream(stream):
+    """Read the rest of a stream so its final usage chunk is reported"""
+    try:
+        for chunk in stream:
+            if getattr(chunk, "usage", None) is not None:
+                _log_prompt_cache(chunk.usage)
+    except Exception as e:
+        logging.warning(f"Failed to drain shader completion stream: {e}")
+    finally:
+        stream.close()
+
+
+def _drain_in_background(stream):
+    # One daemon thread per stream: tails never queue behind each other (so
+    # concurrency follows the caller's workers) and never block exit
+    threading.Thread(target=_drain_stream, args=(stream,), daemon=True).start()
+
+
+# Each render runs in its own node process, so threads are enough to keep
+# every core busy while other workers wait on the LLM.
+_render_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 4)
+
+
+# Set LLUMINATE_RENDER_CACHE=off to re-render every shader
+RENDER_CACHE_DIR = os.path.expanduser(
+    os.environ.get("LLUMINATE_RENDER_CACHE_DIR", "~/.cache/lluminate/renders")
+)
+
+
+def render_cache_enabled() -> bool:
+    return os.environ.get("LLUMINATE_RENDER_CACHE", "on").lower() != "off"
+
+
+def _render_key(genome: str, width: int, height: int, t: float) -> str:
+    # Collapse whitespace within lines but keep line breaks, which end
+    # // comments and preprocessor directives
+    lines = (re.sub(r"\s+", " ", line).strip() for line in genome.splitlines())
+    normalized = "\n".join(line for line in lines if line)
+    spec = f"{normalized}\n{vertex_code}\n{width}x{height}\nt={t}"
+    return hashlib.sha1(spec.encode()).hexdigest()
+
+
+def _link_or_copy(src: str, dst: str):
+    # os.link needs a free name, unique across threads and runs sharing the dir
+    tmp_path = f"{dst}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.link(src, tmp_path)
+    except OSError:
+        shutil.copyfile(src, tmp_path)
+    os.replace(tmp_path, dst)
+
+
+def _render_job(genome: str, frame_path: str, width: int, height: int, t: float):
+    if not render_cache_enabled():
+        return shader_to_image(
+            genome, vertex_code, frame_path, width, height, uniforms={"time": t}
+        )
+
+    # Identical (or whitespace-only different) shaders reuse the earlier render
+    cache_path = os.path.join(
+        RENDER_CACHE_DIR, f"{_render_key(genome, width, height, t)}.png"
+    )
+    if os.path.exists(cache_path):
+        _link_or_copy(cache_path, frame_path)
+        return frame_path
+
+    result = shader_to_image(
+        genome, vertex_code, frame_path, width, height, uniforms={"time": t}
+    )
+    if result:
+        os.makedirs(RENDER_CACHE_DIR, exist_ok=True)
+        _link_or_copy(frame_path, cache_path)
+    return result
+
 
 class ShaderArtifact(Artifact):
     name = "shader"
@@ -33,64 +122,116 @@ class ShaderArtifact(Artifact):
 	varying vec2 uv;
 	uniform float time;
     Start the file with  "precision mediump float;"
-    """
+    """ + glslReference
 
     @classmethod
     def create_from_prompt(cls, prompt: str, output_dir: str, **kwargs):
-        artifact = cls()
-        artifact.prompt = prompt
-
-        response = llm_client.chat.completions.create(
-            model=defaultModel,
-            max_completion_tokens=20000,
-            reasoning_effort=kwargs.get("reasoning_effort", "low"),
-            messages=[
-                {"role": "system", "content": cls.systemPrompt},
-                {"role": "user", "content": f"User prompt: {prompt}"},
-            ],
+        artifacts = cls.create_batch_from_prompt(prompt, output_dir, 1, **kwargs)
+        if not artifacts:
+            raise RuntimeError("Failed to create shader artifact")
+        return artifacts[0]
+
+    @classmethod
+    def create_batch_from_prompt(cls, prompt: str, output_dir: str, n: int, **kwargs):
+        """Generate n shaders from one request (n= choices), rendered in parallel"""
+        messages = [
+            {"role": "system", "content": cls.systemPrompt},
+            {"role": "user", "content": f"User prompt: {prompt}"},
+        ]
+        reasoning_effort = kwargs.get("reasoning_effort", "low")
+
+        def complete(k):
+            if k == 1:
+                # Stream and return at the closing code fence so rendering can
+                # start without waiting for any trailing text. The tail is read
+                # in the background for its usage (prompt cache hits, and the
+                # rate limiter's token refund).
+                stream = llm_client.chat.completions.create(
+                    model=defaultModel,
+                    max_completion_tokens=20000,
+                    reasoning_effort=reasoning_effort,
+                    messages=messages,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                )
+                try:
+                    text = streamUntilCode(stream)
+                except Exception:
+                    stream.close()
+                    raise
+                _drain_in_background(stream)
+                return [text]
+
+            response = llm_client.chat.completions.create(
+                model=defaultModel,
+                max_completion_tokens=20000,
+                reasoning_effort=reasoning_effort,
+                messages=messages,
+                n=k,
+            )
+            _log_prompt_cache(getattr(response, "usage", None))
+            return [choice.message.content for choice in response.choices]
+
+        key = llm_cache.make_key(
+            defaultModel, messages, reasoning_effort=reasoning_effort
         )
+        texts = llm_cache.get_or_compute_many(key, n, complete)
 
-        artifact.genome = extractCode(response.choices[0].message.content.strip())
-        os.makedirs(os.path.join(output_dir, "images"), exist_ok=True)
-        artifact.render_phenotype(os.path.join(output_dir, "images"), **kwargs)
-        artifact.compute_embedding()
+        def finish(text):
+            try:
+                artifact = cls()
+                artifact.prompt = prompt
+                artifact.genome = extractCode(text.strip())
+                artifact._save(output_dir, **kwargs)
+                return artifact
+            except Exception as e:
+                logging.error(f"Failed to finish shader artifact: {e}")
+                return None
+
+        if not texts:
+            return []
+        if len(texts) == 1:
+            artifacts = [finish(texts[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=len(texts)) as executor:
+                artifacts = list(executor.map(finish, texts))
 
-        os.makedirs(os.path.join(output_dir, "source"), exist_ok=True)
-        genome_path = os.path.join(output_dir, f"source/{artifact.id}.glsl")
-        with open(genome_path, "w") as f:
-            f.write(artifact.genome)
+        artifacts = [artifact for artifact in artifacts if artifact is not None]
 
-        # if self.embedding is not None:
-        os.makedirs(os.path.join(output_dir, "embeddings"), exist_ok=True)
-        embedding_path = os.path.join(output_dir, f"embeddings/{artifact.id}.npy")
-        np.save(embedding_path, artifact.embedding.cpu().numpy())
+        # Embed every rendered frame of the batch at once, dropping shaders
+        # that failed to render
+        cls.compute_embeddings(artifacts)
+        artifacts = [a for a in artifacts if a.embedding is not None]
+        for artifact in artifacts:
+            artifact.save_embedding(output_dir)
 
-        # Save prompt to output dir
-        os.makedirs(os.path.join(output_dir, "prompts"), exist_ok=True)
-        prompt_path = os.path.join(output_dir, f"prompts/{artifact.id}.txt")
-        with open(prompt_path, "w") as f:
-            f.write(prompt)
+        return artifacts
 
-        # artifacts_dir = os.path.join(output_dir, "artifacts")
-        # os.makedirs(artifacts_dir, exist_ok=True)
+    def _save(self, output_dir: str, **kwargs):
+        """Render the artifact into output_dir (source and prompt go to the shard)"""
+        os.makedirs(os.path.join(output_dir, "images"), exist_ok=True)
+        self.render_phenotype(os.path.join(output_dir, "images"), **kwargs)
 
-        # for artifact in self.artifacts:
-        #     artifact.save(artifacts_dir)
-        return artifact
+    def compact_genome(self, max_tokens: int = 400) -> str:
+        """Shader without comments, trimmed to main() and its helpers if too long"""
+        return compact_shader(self.genome, max_tokens)
 
     def render_phenotype(self, output_dir: str, **kwargs) -> Optional[str]:
         """Render the shader to an image"""
         os.makedirs(output_dir, exist_ok=True)
 
         time_points = [0, 3]
-        frame_paths = []
+        frame_paths = [
+            f"{output_dir}/{self.id}_t{i}.png" for i in range(len(time_points))
+        ]
 
-        for i, t in enumerate(time_points):
-            frame_path = f"{output_dir}/{self.id}_t{i}.png"
-            shader_to_image(
-                self.genome, vertex_code, frame_path, 768, 768, uniforms={"time": t}
-            )
-            frame_paths.append(frame_path)
+        # Render all frames concurrently on the shared render pool
+        futures = [
+            _render_executor.submit(_render_job, self.genome, frame_path, 768, 768, t)
+            for frame_path, t in zip(frame_paths, time_points)
+        ]
+        for future in futures:
+            future.result()
 
         self.phenome = frame_paths
 
@@ -115,3 +256,8 @@ class ShaderArtifact(Artifact):
         normalized = torch.nn.functional.normalize(concat_embedding, dim=0)
         self.embedding = normalized
         return self.embedding
+
+    @classmethod
+    def compute_embeddings(cls, artifacts: List[Artifact], batch_size: int = 64):
+        """Compute embeddings for many artifacts, batching all of their frames"""
+        return cls._embed_frames(artifacts, batch_size)
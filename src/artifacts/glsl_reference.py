@@ -0,0 +1,122 @@
+# Static GLSL ES 1.00 (WebGL 1.0) reference appended to the shader system prompt.
+# It must stay byte-identical between calls: together with the instructions it
+# makes a stable prefix of more than 1024 tokens, which providers cache.
+
+glslReference = """
+GLSL ES 1.00 (WebGL 1.0) reference card
+
+Types:
+    void bool int float
+    vec2 vec3 vec4 bvec2 bvec3 bvec4 ivec2 ivec3 ivec4
+    mat2 mat3 mat4 (column-major; m[i] is column i)
+    sampler2D samplerCube (not available here: no textures are bound)
+    Arrays are one-dimensional with a constant size: float a[4];
+    Structs are allowed: struct Ray { vec3 o; vec3 d; };
+
+Qualifiers:
+    const, uniform, varying (read-only in the fragment shader)
+    Function parameters: in (default), out, inout
+    Precision: lowp, mediump, highp; "precision mediump float;" must come first.
+    highp is not guaranteed in fragment shaders; avoid relying on it.
+
+Constructors and swizzles:
+    vec3(1.0) fills every component; vec4(v.xyz, 1.0); mat2(c, -s, s, c)
+    Swizzle with .xyzw, .rgba or .stpq, e.g. v.xy, c.bgr, v.xxyy
+    Write masks must not repeat components: v.xx = ... is invalid.
+
+Operators:
+    + - * / on scalars, vectors and matrices (component-wise, except
+    matrix * vector and matrix * matrix, which are linear algebra products)
+    < > <= >= on scalars only; use the vector relational functions for vectors
+    == != compare whole values; && || ^^ ! on bool only
+    There is no % operator, no bitwise operators (& | ^ ~ << >>) and no switch.
+
+Conversions:
+    No implicit conversions: 1 is an int and 1.0 is a float.
+    float x = 1; is a compile error, write float x = 1.0;
+    Convert explicitly with float(i), int(f), bool(x), vec2(ivec2(...)).
+
+Control flow:
+    if / else, for, while, do-while, break, continue, return, discard
+    WebGL 1.0 only guarantees for loops of the form
+        for (int i = 0; i < N; i++) { ... }
+    where N is a constant expression and i is not modified in the body.
+    Loop with a constant bound and break early instead of using a uniform bound.
+    Recursion is not allowed.
+    Array indices must be constant expressions or loop indices.
+
+Angle and trigonometry functions (genType = float, vec2, vec3 or vec4):
+    radians(genType degrees)       degrees(genType radians)
+    sin(genType)  cos(genType)  tan(genType)
+    asin(genType) acos(genType)
+    atan(genType y, genType x)     atan(genType y_over_x)
+
+Exponential functions:
+    pow(genType x, genType y)   results are undefined for x < 0
+    exp(genType)   log(genType)   exp2(genType)   log2(genType)
+    sqrt(genType)  inversesqrt(genType)
+
+Common functions:
+    abs(genType)   sign(genType)   floor(genType)   ceil(genType)
+    fract(genType)                 mod(genType x, genType y), mod(genType x, float y)
+    min(genType x, genType y), min(genType x, float y)
+    max(genType x, genType y), max(genType x, float y)
+    clamp(genType x, genType lo, genType hi), clamp(genType x, float lo, float hi)
+    mix(genType x, genType y, genType a), mix(genType x, genType y, float a)
+    step(genType edge, genType x), step(float edge, genType x)
+    smoothstep(genType e0, genType e1, genType x), smoothstep(float e0, float e1, genType x)
+    There is no round(), trunc(), tanh(), sinh(), cosh() or inverse(): write
+    floor(x + 0.5) for rounding and (exp(2.0 * x) - 1.0) / (exp(2.0 * x) + 1.0) for tanh.
+
+Geometric functions:
+    length(genType x)              distance(genType p0, genType p1)
+    dot(genType x, genType y)      cross(vec3 x, vec3 y)
+    normalize(genType x)           faceforward(genType N, genType I, genType Nref)
+    reflect(genType I, genType N)  refract(genType I, genType N, float eta)
+
+Matrix functions:
+    matrixCompMult(mat x, mat y)   component-wise product
+    There is no transpose(), determinant() or inverse() in GLSL ES 1.00.
+
+Vector relational functions (bvec results):
+    lessThan(x, y)  lessThanEqual(x, y)  greaterThan(x, y)  greaterThanEqual(x, y)
+    equal(x, y)  notEqual(x, y)  any(bvec)  all(bvec)  not(bvec)
+
+Texture lookup functions (listed for completeness; no samplers are provided):
+    texture2D(sampler2D s, vec2 coord)
+    texture2D(sampler2D s, vec2 coord, float bias)
+    texture2DProj(sampler2D s, vec3 coord)   texture2DProj(sampler2D s, vec4 coord)
+    textureCube(samplerCube s, vec3 coord)
+
+Derivatives:
+    dFdx, dFdy and fwidth need the OES_standard_derivatives extension and are
+    not available. Estimate gradients with finite differences instead.
+
+Built-in variables:
+    gl_FragCoord (vec4, window coordinates in pixels)
+    gl_FrontFacing (bool)   gl_PointCoord (vec2)
+    gl_FragColor (vec4) is the output color; write it exactly once per path.
+    Do not declare your own output variables.
+
+Built-in constants:
+    gl_MaxDrawBuffers, gl_MaxTextureImageUnits and similar limits exist but are
+    rarely needed. Define PI yourself: const float PI = 3.14159265359;
+
+Common patterns:
+    Hash:  fract(sin(dot(p, vec2(127.1, 311.7))) * 43758.5453)
+    Value noise: interpolate hashed lattice values with smoothstep weights.
+    fBm: sum noise octaves in a constant-bound loop, halving amplitude and
+    doubling frequency each step.
+    Rotation: mat2(cos(a), -sin(a), sin(a), cos(a)) * p
+    Centered coordinates: vec2 p = uv * 2.0 - 1.0;
+    Palette: a + b * cos(6.28318 * (c * t + d))
+    Gamma: pow(color, vec3(1.0 / 2.2))
+
+Common compile errors to avoid:
+    Using an int where a float is expected (write 2.0, not 2).
+    Declaring a function after it is used without a prototype.
+    Using a uniform or non-constant value as a loop bound.
+    Indexing an array with a non-constant, non-loop-index expression.
+    Redefining built-in functions or using reserved words as identifiers.
+    Missing the precision statement at the top of the shader.
+"""
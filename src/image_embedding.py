@@ -18,3 +18,16 @@ class ImageEmbedder:
         with torch.no_grad():
             embedding = self.model.encode_image(image_input)[0]
         return embedding.cpu()
+
+    def embedImages(self, image_paths, batch_size=64):
+        """Embed many images, batch_size at a time. Returns an (N, D) tensor"""
+        embeddings = []
+        for i in range(0, len(image_paths), batch_size):
+            images = [
+                self.preprocess(Image.open(path).convert("RGB"))
+                for path in image_paths[i : i + batch_size]
+            ]
+            image_input = torch.stack(images).to(self.device)
+            with torch.no_grad():
+                embeddings.append(self.model.encode_image(image_input).cpu())
+        return torch.cat(embeddings)
@@ -0,0 +1,89 @@
+import os
+import json
+import hashlib
+import tempfile
+import threading
+from typing import Callable, List
+
+# Set LLUMINATE_CACHE=off to always call the LLM
+CACHE_DIR = os.path.expanduser(
+    os.environ.get("LLUMINATE_CACHE_DIR", "~/.cache/lluminate/llm")
+)
+
+_lock = threading.Lock()
+_next_sample = {}
+# Runs with different random seeds must not replay each other's samples
+_seed = None
+
+
+def cache_enabled() -> bool:
+    return os.environ.get("LLUMINATE_CACHE", "on").lower() != "off"
+
+
+def set_seed(seed) -> None:
+    """Namespace the cache by the run's random seed and restart replay from sample 0"""
+    global _seed
+    with _lock:
+        _seed = seed
+        _next_sample.clear()
+
+
+def make_key(model: str, messages, **kwargs) -> str:
+    """Content hash of everything that determines a completion"""
+    payload = json.dumps(
+        {"model": model, "messages": messages, "seed": _seed, **kwargs},
+        sort_keys=True,
+    )
+    return hashlib.blake2b(payload.encode()).hexdigest()
+
+
+def _sample_path(key: str, index: int) -> str:
+    return os.path.join(CACHE_DIR, key, f"{index}.txt")
+
+
+def get_or_compute(key: str, compute: Callable[[], str]) -> str:
+    """Return a cached completion for key, or compute and store it"""
+    return get_or_compute_many(key, 1, lambda n: [compute()])[0]
+
+
+def get_or_compute_many(
+    key: str, n: int, compute_many: Callable[[int], List[str]]
+) -> List[str]:
+    """
+    Return n completions for key, computing only the ones not yet cached.
+
+    Identical requests are expected to give *different* samples (e.g. the
+    whole initial population shares one prompt), so each key holds a list of
+    completions. Requests for a key in this process replay the stored samples
+    in order and only call compute_many(k) for the k that are missing.
+    """
+    if not cache_enabled():
+        return compute_many(n)
+
+    with _lock:
+        start = _next_sample.get(key, 0)
+        _next_sample[key] = start + n
+
+    texts = []
+    for index in range(start, start + n):
+        path = _sample_path(key, index)
+        if not os.path.exists(path):
+            break
+        with open(path, "r") as f:
+            texts.append(f.read())
+
+    missing = n - len(texts)
+    if missing == 0:
+        return texts
+
+    computed = compute_many(missing)
+    for index, text in enumerate(computed, start=start + len(texts)):
+        path = _sample_path(key, index)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Unique temp name: other threads or runs may share the cache dir
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+    return texts + computed
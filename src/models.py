@@ -1,13 +1,14 @@
 import aisuite as ai
 from .text_embedding import TextEmbedder
 from .image_embedding import ImageEmbedder
+from .rate_limited_client import RateLimitedClient
 import asyncio
 from PIL import Image
 import requests
 from io import BytesIO
 
-# Global LLM client
-llm_client = ai.Client()
+# Global LLM client, throttled per model to stay under provider RPM/TPM limits
+llm_client = RateLimitedClient(ai.Client(), rpm=500, tpm=200_000)
 
 # Global embedders
 text_embedder = TextEmbedder()
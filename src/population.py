@@ -1,5 +1,6 @@
 import os
-import json
+import heapq
+import orjson
 import torch
 import numpy as np
 from abc import ABC, abstractmethod
@@ -7,6 +8,12 @@ from typing import List, Dict, Any, Optional, Tuple, Union
 from datetime import datetime
 
 from .artifacts import Artifact
+from .utils import get_device
+
+
+def similarity_dtype(device: torch.device) -> torch.dtype:
+    """Half precision on GPU/MPS; CPU has no fast fp16 matmul so keep float32"""
+    return torch.float16 if device.type in ("cuda", "mps") else torch.float32
 
 
 class Population:
@@ -15,23 +22,110 @@ class Population:
     def __init__(self):
         self.artifacts = []
         self.id_to_artifact = {}
+        self.id_to_index = {}
+        # Normalized embeddings (N x D) and their cosine similarity (N x N), in
+        # artifact order, on get_device(). Built lazily and then updated
+        # incrementally.
+        self._embeddings = None
+        self._similarity = None
 
     def add(self, artifact: Artifact):
         """Add a genome to the population"""
-        self.artifacts.append(artifact)
-        self.id_to_artifact[artifact.id] = artifact
+        self.add_all([artifact])
 
     def add_all(self, artifacts: List[Artifact]):
         """Add multiple genomes to the population"""
         for artifact in artifacts:
-            self.add(artifact)
+            self.id_to_index[artifact.id] = len(self.artifacts)
+            self.artifacts.append(artifact)
+            self.id_to_artifact[artifact.id] = artifact
+        self._extend_similarity(artifacts)
 
     def remove(self, artifact: Artifact):
-        """Remove a genome from the population"""
+        """Remove a genome from the population (moves the last genome into its slot)"""
         if artifact.id in self.id_to_artifact:
-            self.artifacts.remove(artifact)
+            i = self.id_to_index.pop(artifact.id)
             del self.id_to_artifact[artifact.id]
 
+            # Swap with the last genome and pop, instead of shifting the list
+            last = self.artifacts.pop()
+            if i < len(self.artifacts):
+                self.artifacts[i] = last
+                self.id_to_index[last.id] = i
+
+            if self._similarity is not None:
+                n = len(self.artifacts)
+                if i < n:
+                    self._embeddings[i] = self._embeddings[n]
+                    self._similarity[i, :] = self._similarity[n, :]
+                    self._similarity[:, i] = self._similarity[:, n]
+                self._embeddings = self._embeddings[:n]
+                self._similarity = self._similarity[:n, :n]
+
+    def subset(self, indices: List[int]) -> "Population":
+        """New population with the artifacts at indices, reusing cached similarities"""
+        population = Population()
+        for i in indices:
+            artifact = self.artifacts[i]
+            population.id_to_index[artifact.id] = len(population.artifacts)
+            population.artifacts.append(artifact)
+            population.id_to_artifact[artifact.id] = artifact
+
+        if self._similarity is not None:
+            index = torch.tensor(
+                indices, dtype=torch.long, device=self._similarity.device
+            )
+            population._embeddings = self._embeddings[index]
+            population._similarity = self._similarity[index][:, index]
+
+        return population
+
+    def compute_embeddings_batched(self, batch_size: int = 64):
+        """Compute all missing embeddings in batches, grouped by artifact class"""
+        pending = {}
+        for artifact in self.artifacts:
+            if artifact.embedding is None:
+                pending.setdefault(type(artifact), []).append(artifact)
+
+        for artifact_class, artifacts in pending.items():
+            artifact_class.compute_embeddings(artifacts, batch_size=batch_size)
+
+    @staticmethod
+    def _normalize(embeddings: torch.Tensor) -> torch.Tensor:
+        """Move embeddings to the compute device and L2-normalize them"""
+        device = get_device()
+        embeddings = embeddings.to(device=device, dtype=torch.float32)
+        norm_emb = torch.nn.functional.normalize(embeddings, dim=1)
+        return norm_emb.to(similarity_dtype(device))
+
+    def _normalized_embeddings(self, artifacts: List[Artifact]) -> torch.Tensor:
+        self.compute_embeddings_batched()
+        return self._normalize(torch.stack([a.embedding for a in artifacts]))
+
+    def _extend_similarity(self, artifacts: List[Artifact]):
+        """Append rows/columns for new artifacts to the cached similarity matrix"""
+        if self._similarity is None or not artifacts:
+            return
+
+        new_emb = self._normalized_embeddings(artifacts)
+        cross = torch.mm(self._embeddings, new_emb.t())
+        inner = torch.mm(new_emb, new_emb.t())
+        self._similarity = torch.cat(
+            [
+                torch.cat([self._similarity, cross], dim=1),
+                torch.cat([cross.t(), inner], dim=1),
+            ],
+            dim=0,
+        )
+        self._embeddings = torch.cat([self._embeddings, new_emb], dim=0)
+
+    def similarity_matrix(self) -> torch.Tensor:
+        """Cosine similarity between all genomes, computed once and then cached"""
+        if self._similarity is None:
+            self._embeddings = self._normalized_embeddings(self.artifacts)
+            self._similarity = torch.mm(self._embeddings, self._embeddings.t())
+        return self._similarity
+
     def get(self, artifact_id: str) -> Optional[Artifact]:
         """Get a genome by ID"""
         return self.id_to_artifact.get(artifact_id)
@@ -50,16 +144,15 @@ class Population:
 
     def get_best(self, count: int = 1) -> List[Artifact]:
         """Get genomes with highest fitness"""
-        sorted_artifacts = sorted(
+        return heapq.nlargest(
+            count,
             self.artifacts,
             key=lambda a: a.fitness if a.fitness is not None else float("-inf"),
-            reverse=True,
         )
-        return sorted_artifacts[:count]
 
     def select_by_novelty(
         self,
-        embeddings: torch.Tensor,
+        embeddings: Optional[torch.Tensor] = None,
         k_neighbors: int = 3,
         return_distances: bool = False,
     ) -> Union[List[int], Tuple[List[int], torch.Tensor]]:
@@ -67,11 +160,9 @@ class Population:
         Select genomes by novelty score (distance to k nearest neighbors)
         Returns indices of genomes sorted by novelty (highest first)
 
+        If embeddings is None, the population's cached similarity matrix is used.
         If return_distances is True, also returns the average distance to k nearest neighbors
         """
-        # Ensure we're working with float32 for MPS compatibility
-        embeddings = embeddings.to(torch.float32)
-        
         if len(self.artifacts) <= k_neighbors:
             indices = list(range(len(self.artifacts)))
             if return_distances:
@@ -79,22 +170,24 @@ class Population:
                 return indices, torch.zeros(len(self.artifacts), dtype=torch.float32)
             return indices
 
-        norm_emb = torch.nn.functional.normalize(embeddings, dim=1)
-        similarity = torch.mm(norm_emb, norm_emb.t())
-        distances = 1 - similarity  # cosine distance
+        if embeddings is None:
+            # Copy so the in-place ops below leave the cache intact
+            similarity = self.similarity_matrix().clone()
+        else:
+            norm_emb = self._normalize(embeddings)
+            similarity = torch.mm(norm_emb, norm_emb.t())
+        distances = similarity.neg_().add_(1)  # cosine distance, in place
 
         # Set self-distance to a high value to exclude from nearest neighbor calculation
         # Use a value that can safely be represented in all precisions
         max_val = torch.finfo(distances.dtype).max / 2
-        for i in range(distances.shape[0]):
-            distances[i, i] = max_val
+        distances.fill_diagonal_(max_val)
 
         # Get k nearest neighbors for each genome
-        sorted_dist, _ = torch.sort(distances, dim=1)
-        k_nearest = sorted_dist[:, :k_neighbors]
+        k_nearest, _ = torch.topk(distances, k_neighbors, dim=1, largest=False)
 
         # Compute novelty as average distance to k nearest neighbors
-        novelty_scores = k_nearest.mean(dim=1)
+        novelty_scores = k_nearest.mean(dim=1).to("cpu", torch.float32)
 
         # Get indices sorted by novelty (highest first)
         sorted_indices = torch.argsort(novelty_scores, descending=True).tolist()
@@ -118,8 +211,8 @@ class Population:
 
         # Append to population data file
         population_path = os.path.join(output_dir, "population_data.jsonl")
-        with open(population_path, "a") as f:
-            f.write(json.dumps(population_data) + "\n")
+        with open(population_path, "ab") as f:
+            f.write(orjson.dumps(population_data) + b"\n")
 
         return population_path
 
@@ -0,0 +1,45 @@
+import os
+import orjson
+import threading
+from typing import List, Dict, Any
+
+from .artifacts import Artifact
+
+
+class PopulationStore:
+    """
+    Append-only JSONL shard holding one record per artifact.
+
+    The shard is the only on-disk copy of each artifact's genome, prompt and
+    metadata; rendered images and embeddings stay in their own files.
+    """
+
+    def __init__(self, output_dir: str, filename: str = "artifacts.jsonl"):
+        os.makedirs(output_dir, exist_ok=True)
+        self.path = os.path.join(output_dir, filename)
+        self.lock = threading.Lock()
+
+        # Kept open for the whole run; each record is a single unbuffered write
+        self.f = open(self.path, "ab", buffering=0)
+
+    def append(self, record: Dict[str, Any]):
+        """Append a record to the shard"""
+        line = orjson.dumps(record, option=orjson.OPT_SERIALIZE_NUMPY) + b"\n"
+        with self.lock:
+            self.f.write(line)
+
+    def add(self, artifact: Artifact):
+        artifact.save_into(self)
+
+    def add_all(self, artifacts: List[Artifact]):
+        for artifact in artifacts:
+            self.add(artifact)
+
+    def close(self):
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
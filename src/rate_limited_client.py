@@ -0,0 +1,194 @@
+import time
+import random
+import logging
+import threading
+from types import SimpleNamespace
+from typing import Dict, List, Any
+
+
+class TokenBucket:
+    """Thread-safe token bucket that refills continuously over a time window"""
+
+    def __init__(self, capacity: float, period: float = 60.0):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount: float = 1.0):
+        """Block until `amount` tokens are available, then take them"""
+        # A single request larger than the bucket could never be satisfied
+        amount = min(amount, self.capacity)
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def refund(self, amount: float):
+        """Return unused tokens (or take more if amount is negative)"""
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+
+def estimate_tokens(messages: List[Dict[str, Any]]) -> int:
+    """Rough token count for chat messages (~4 characters per token)"""
+    n_chars = 0
+    for message in messages:
+        content = message.get("content", "")
+        if isinstance(content, str):
+            n_chars += len(content)
+        else:
+            for part in content:
+                if part.get("type") == "text":
+                    n_chars += len(part["text"])
+    return n_chars // 4 + 4 * len(messages)
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Check for a 429 across the providers wrapped by aisuite"""
+    if type(error).__name__ == "RateLimitError":
+        return True
+    return getattr(error, "status_code", None) == 429
+
+
+class MeteredStream:
+    """
+    Wraps a streamed completion and settles its token reservation when it ends.
+
+    Streams carry no usage until their final chunk (and only with
+    stream_options={"include_usage": True}), so the reservation is refunded
+    once the stream is exhausted or closed: from the reported usage if it
+    arrived, otherwise from an estimate of the prompt plus the text read.
+    """
+
+    def __init__(
+        self, stream, bucket: TokenBucket, reserved: float, prompt_tokens: int
+    ):
+        self.stream = stream
+        self.iterator = iter(stream)
+        self.bucket = bucket
+        self.reserved = reserved
+        self.prompt_tokens = prompt_tokens
+        self.n_chars = 0
+        self.usage = None
+        self.settled = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            chunk = next(self.iterator)
+        except BaseException:
+            # StopIteration included: the stream is finished either way
+            self._settle()
+            raise
+
+        if getattr(chunk, "usage", None) is not None:
+            self.usage = chunk.usage
+        for choice in chunk.choices or []:
+            self.n_chars += len(getattr(choice.delta, "content", None) or "")
+        return chunk
+
+    def _settle(self):
+        if self.settled:
+            return
+        self.settled = True
+        used = getattr(self.usage, "total_tokens", None)
+        if used is None:
+            used = self.prompt_tokens + self.n_chars // 4
+        self.bucket.refund(self.reserved - used)
+
+    def close(self):
+        self._settle()
+        if hasattr(self.stream, "close"):
+            self.stream.close()
+
+
+class RateLimitedClient:
+    """
+    Wraps an aisuite client so every chat completion is throttled per model.
+
+    Requests and tokens are drawn from per-model buckets before each call so
+    concurrent workers sleep proactively instead of hammering the API into
+    429s. Tokens are reserved for the prompt plus the completion budget and
+    the unused part is refunded from the reported usage (for streams, when
+    the stream ends; see MeteredStream). Rate limit errors
+    that still slip through are retried with jittered exponential backoff.
+    """
+
+    def __init__(
+        self,
+        client,
+        rpm: int = 500,
+        tpm: int = 200_000,
+        max_retries: int = 6,
+        max_wait: float = 60.0,
+    ):
+        self.client = client
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_retries = max_retries
+        self.max_wait = max_wait
+        self.buckets: Dict[str, SimpleNamespace] = {}
+        self.lock = threading.Lock()
+        # Mirror the client.chat.completions.create call signature
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def _get_buckets(self, model: str) -> SimpleNamespace:
+        with self.lock:
+            if model not in self.buckets:
+                self.buckets[model] = SimpleNamespace(
+                    requests=TokenBucket(self.rpm), tokens=TokenBucket(self.tpm)
+                )
+            return self.buckets[model]
+
+    def create(self, model: str, messages: List[Dict[str, Any]], **kwargs):
+        buckets = self._get_buckets(model)
+        prompt_tokens = estimate_tokens(messages)
+        # Each of the n choices can use the full completion budget
+        reserved = prompt_tokens + kwargs.get("n", 1) * kwargs.get(
+            "max_completion_tokens", kwargs.get("max_tokens", 0)
+        )
+        # acquire() caps a single reservation at the bucket size
+        reserved = min(reserved, buckets.tokens.capacity)
+
+        for attempt in range(self.max_retries):
+            buckets.requests.acquire()
+            buckets.tokens.acquire(reserved)
+            try:
+                response = self.client.chat.completions.create(
+                    model=model, messages=messages, **kwargs
+                )
+            except Exception as e:
+                # A failed request generated nothing, so give the tokens back
+                buckets.tokens.refund(reserved)
+                if not is_rate_limit_error(e) or attempt == self.max_retries - 1:
+                    raise
+                wait = min(self.max_wait, 2**attempt) * (1 + random.random())
+                logging.warning(
+                    f"Rate limited on {model}, retrying in {wait:.1f}s "
+                    f"(attempt {attempt + 1}/{self.max_retries})"
+                )
+                time.sleep(wait)
+                continue
+
+            if kwargs.get("stream"):
+                return MeteredStream(response, buckets.tokens, reserved, prompt_tokens)
+
+            usage = getattr(response, "usage", None)
+            used = getattr(usage, "total_tokens", None)
+            if used is not None:
+                buckets.tokens.refund(reserved - used)
+            return response
@@ -1,17 +1,20 @@
 import os
 import json
+import orjson
 import random
 import logging
 import numpy as np
 import torch
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Union
+from typing import Dict, Any, Optional, Union
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import traceback
 
 from .population import Population
+from .population_store import PopulationStore
 from .artifacts import Artifact, get_artifact_class
 from .models import llm_client
+from . import llm_cache
 from .creative_strategies_manager import CreativityStrategyManager
 from .utils import load_image_path_base64
 
@@ -63,7 +66,7 @@ def construct_crossover_prompt(artifacts, user_prompt, summary, creative_strateg
         prompt += f"Summary of the current population: {summary}\n\n"
     for i, artifact in enumerate(artifacts):
         prompt += f"Example {i+1}:\n"
-        prompt += f"{artifact.genome}\n\n"
+        prompt += f"{artifact.compact_genome()}\n\n"
     if creative_strategy:
         prompt += f"\n{creative_strategy}\n"
     return prompt
@@ -90,15 +93,6 @@ def construct_repair_prompt(
     return prompt
 
 
-def get_embeddings(artifacts: List[Artifact]) -> torch.Tensor:
-    """Compute embeddings for a list of artifacts"""
-    embeddings = []
-    for artifact in artifacts:
-        embedding = artifact.compute_embedding()
-        embeddings.append(embedding)
-    return torch.stack(embeddings)
-
-
 def complete_prompt(prompt: str, model: str = "openai:gpt-4o-mini") -> str:
     return (
         llm_client.chat.completions.create(
@@ -125,9 +119,7 @@ def save_novelty_metrics(
 ):
     """Calculate and save novelty metrics for the current population."""
     _, avg_distances = population.select_by_novelty(
-        get_embeddings(population.get_all()),
-        k_neighbors=k_neighbors,
-        return_distances=True,
+        k_neighbors=k_neighbors, return_distances=True
     )
 
     # Group artifacts by creative strategy
@@ -153,7 +145,7 @@ def save_novelty_metrics(
     novelty_metrics = {
         "generation": generation,
         "timestamp": datetime.now().isoformat(),
-        "avg_distance_to_neighbors": avg_distances.tolist(),
+        "avg_distance_to_neighbors": avg_distances.cpu().numpy(),
         "mean_novelty": float(avg_distances.mean().item()),
         "mean_genome_length": np.mean(
             [len(artifact.genome) for artifact in population.get_all()]
@@ -162,8 +154,11 @@ def save_novelty_metrics(
     }
 
     metrics_path = os.path.join(output_dir, "novelty_metrics.jsonl")
-    with open(metrics_path, "a") as f:
-        f.write(json.dumps(novelty_metrics) + "\n")
+    # Strategy names are None when creative strategies are disabled; like json,
+    # OPT_NON_STR_KEYS writes that key as "null"
+    options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    with open(metrics_path, "ab") as f:
+        f.write(orjson.dumps(novelty_metrics, option=options) + b"\n")
 
     return float(avg_distances.mean().item())
 
@@ -173,38 +168,46 @@ def create_initial_population(config, artifacts_dir, ArtifactClass):
     logging.info("Generating initial population...")
     initial_artifacts = []
 
-    def create_artifact():
+    # All initial artifacts share one prompt, so several can come from one request
+    batch_size = config.get("batch_size", 1)
+
+    def create_artifacts(n):
         try:
-            return ArtifactClass.create_from_prompt(
+            if n == 1:
+                return [
+                    ArtifactClass.create_from_prompt(
+                        prompt=config["prompt"],
+                        output_dir=artifacts_dir,
+                        reasoning_effort=config["reasoning_effort"],
+                        image_url=None,
+                    )
+                ]
+            return ArtifactClass.create_batch_from_prompt(
                 prompt=config["prompt"],
                 output_dir=artifacts_dir,
+                n=n,
                 reasoning_effort=config["reasoning_effort"],
                 image_url=None,
             )
         except Exception as e:
             logging.error(f"Failed to create artifact: {e}\n{traceback.format_exc()}")
-            return None
+            return []
 
     with ThreadPoolExecutor(max_workers=config.get("max_workers", 4)) as executor:
-        future_to_artifact = {
-            executor.submit(create_artifact): i
-            for i in range(config["initial_population_size"])
-        }
-
-        for future in as_completed(future_to_artifact):
-            artifact = future.result()
-            if artifact:
-                initial_artifacts.append(artifact)
-
-    # If there are errors, fill in the rest with random parents
-    while len(initial_artifacts) < config["initial_population_size"]:
-        if not initial_artifacts:  # Handle case where no artifacts were created
-            logging.error("Failed to create any initial artifacts")
-            raise RuntimeError("Could not create initial population")
-
-        child = create_artifact()
-        if child:
-            initial_artifacts.append(child)
+        # Resubmit any failures as a concurrent batch rather than one at a time
+        while len(initial_artifacts) < config["initial_population_size"]:
+            missing = config["initial_population_size"] - len(initial_artifacts)
+            futures = [
+                executor.submit(create_artifacts, min(batch_size, missing - i))
+                for i in range(0, missing, batch_size)
+            ]
+
+            created = [a for f in as_completed(futures) for a in f.result()]
+            if not created and not initial_artifacts:
+                logging.error("Failed to create any initial artifacts")
+                raise RuntimeError("Could not create initial population")
+
+            initial_artifacts.extend(created)
 
     return initial_artifacts
 
@@ -274,43 +277,33 @@ def evolve_population(population, config, artifacts_dir, ArtifactClass, summary=
             return None
 
     with ThreadPoolExecutor(max_workers=config.get("max_workers", 4)) as executor:
-        future_to_artifact = {
-            executor.submit(evolve_artifact, artifact): artifact
-            for artifact in to_evolve
-        }
-
-        for future in as_completed(future_to_artifact):
-            new_artifact = future.result()
-            if new_artifact:
-                new_artifacts.append(new_artifact)
-
-    # If there are errors, fill in the rest
-    while len(new_artifacts) < config["children_per_generation"]:
-        parent = random.choice(population.get_all())
-        child = evolve_artifact(parent)
-        if child:
-            new_artifacts.append(child)
+        while len(new_artifacts) < config["children_per_generation"]:
+            futures = [
+                executor.submit(evolve_artifact, artifact) for artifact in to_evolve
+            ]
+
+            for future in as_completed(futures):
+                new_artifact = future.result()
+                if new_artifact:
+                    new_artifacts.append(new_artifact)
+
+            # If there are errors, fill in the rest with random parents
+            missing = config["children_per_generation"] - len(new_artifacts)
+            to_evolve = [random.choice(population.get_all()) for _ in range(missing)]
 
     return new_artifacts
 
 
 def select_next_generation(population, config):
     """Select the next generation based on novelty."""
-    all_artifacts = population.get_all()
-    embeddings = get_embeddings(all_artifacts)
-
     # Select diverse subset based on novelty
     novelty_indices, _ = population.select_by_novelty(
-        embeddings, k_neighbors=config["k_neighbors"], return_distances=True
+        k_neighbors=config["k_neighbors"], return_distances=True
     )
     keep_indices = novelty_indices[: config["population_size"]]
 
-    # Create new population with selected artifacts
-    new_population = Population()
-    for idx in keep_indices:
-        new_population.add(all_artifacts[idx])
-
-    return new_population
+    # Create new population with selected artifacts, keeping their similarities
+    return population.subset(keep_indices)
 
 
 def run_evolution_experiment(
@@ -321,6 +314,7 @@ def run_evolution_experiment(
     os.makedirs(output_dir, exist_ok=True)
     np.random.seed(config["random_seed"])
     torch.manual_seed(config["random_seed"])
+    llm_cache.set_seed(config["random_seed"])
     
     # Get device information for logging
     from .utils import get_device
@@ -347,60 +341,68 @@ def run_evolution_experiment(
     population = Population()
     population.add_all(initial_artifacts)
 
-    # Save initial population data and metrics
-    population.save(output_dir, generation=0)
-    mean_novelty = save_novelty_metrics(
-        population, output_dir, generation=0, k_neighbors=config["k_neighbors"]
-    )
-    logging.info(f"Initial population mean novelty: {mean_novelty:.4f}")
-
-    # Run evolution
-    for generation in range(config["num_generations"]):
-        logging.info("Generation %d of %d", generation + 1, config["num_generations"])
+    # Every artifact ever created is recorded in a single append-only shard
+    with PopulationStore(output_dir) as store:
+        store.add_all(initial_artifacts)
 
-        # Generate population summary if enabled
-        summary = None
-        if config["use_summary"]:
-            summary = generate_population_summary(
-                population.get_all(), ArtifactClass.name
-            )
-            print("-" * 80)
-            print(summary)
-            print("-" * 80)
-
-            summary_path = os.path.join(output_dir, "summaries.jsonl")
-            with open(summary_path, "a") as f:
-                f.write(
-                    json.dumps({"summary": summary, "generation": generation}) + "\n"
-                )
-
-        # Evolve population
-        new_artifacts = evolve_population(
-            population, config, artifacts_dir, ArtifactClass, summary
+        # Save initial population data and metrics
+        population.save(output_dir, generation=0)
+        mean_novelty = save_novelty_metrics(
+            population, output_dir, generation=0, k_neighbors=config["k_neighbors"]
         )
-        population.add_all(new_artifacts)
+        logging.info(f"Initial population mean novelty: {mean_novelty:.4f}")
 
-        # Select next generation
-        population = select_next_generation(population, config)
+        # Run evolution
+        for generation in range(config["num_generations"]):
+            logging.info(
+                "Generation %d of %d", generation + 1, config["num_generations"]
+            )
 
-        # Save novelty metrics for this generation
-        current_gen = generation + 1
-        mean_novelty = save_novelty_metrics(
-            population,
-            output_dir,
-            generation=current_gen,
-            k_neighbors=config["k_neighbors"],
-        )
+            # Generate population summary if enabled
+            summary = None
+            if config["use_summary"]:
+                summary = generate_population_summary(
+                    population.get_all(), ArtifactClass.name
+                )
+                print("-" * 80)
+                print(summary)
+                print("-" * 80)
+
+                summary_path = os.path.join(output_dir, "summaries.jsonl")
+                with open(summary_path, "a") as f:
+                    f.write(
+                        json.dumps({"summary": summary, "generation": generation})
+                        + "\n"
+                    )
+
+            # Evolve population
+            new_artifacts = evolve_population(
+                population, config, artifacts_dir, ArtifactClass, summary
+            )
+            population.add_all(new_artifacts)
+            store.add_all(new_artifacts)
+
+            # Select next generation
+            population = select_next_generation(population, config)
+
+            # Save novelty metrics for this generation
+            current_gen = generation + 1
+            mean_novelty = save_novelty_metrics(
+                population,
+                output_dir,
+                generation=current_gen,
+                k_neighbors=config["k_neighbors"],
+            )
 
-        logging.info(f"Generation {current_gen} mean novelty: {mean_novelty:.4f}")
+            logging.info(f"Generation {current_gen} mean novelty: {mean_novelty:.4f}")
 
-        # Save generation results
-        population.save(output_dir, generation=current_gen)
-        logging.info(
-            "Generation %d complete. Population size: %d",
-            current_gen,
-            len(population.get_all()),
-        )
+            # Save generation results
+            population.save(output_dir, generation=current_gen)
+            logging.info(
+                "Generation %d complete. Population size: %d",
+                current_gen,
+                len(population.get_all()),
+            )
 
     logging.info("Experiment complete. Results saved to %s", output_dir)
     return population
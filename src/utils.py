@@ -70,6 +70,135 @@ def extractCode(source: str) -> str:
     return matches[0]
 
 
+def streamUntilCode(stream) -> str:
+    """
+    Accumulate a streamed chat completion until its first code block is closed.
+
+    Returns as soon as the code is complete and leaves the stream open; the
+    caller decides whether to read or close the rest.
+
+    Args:
+        stream: Iterator of chat completion chunks (stream=True)
+
+    Returns:
+        str: The response text up to and including the closing backticks
+    """
+    text = ""
+    fences = 0
+    pos = 0
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        text += chunk.choices[0].delta.content or ""
+
+        # Scan only new text; a fence may be split across chunks, so the
+        # last two characters are always re-checked
+        found = text.find("```", pos)
+        while found != -1:
+            fences += 1
+            pos = found + 3
+            found = text.find("```", pos)
+        pos = max(pos, len(text) - 2)
+
+        if fences >= 2:
+            break
+    return text
+
+
+def _split_top_level(code: str):
+    """Split GLSL into top-level (function_name or None, text) chunks"""
+    chunks = []
+    start = 0
+    depth = 0
+    for i, c in enumerate(code):
+        if c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                text = code[start : i + 1]
+                header = text[: text.index("{")]
+                match = re.search(r"(\w+)\s*\([^()]*\)\s*$", header)
+                if match:
+                    chunks.append((match.group(1), text.strip()))
+                    start = i + 1
+        elif c == ";" and depth == 0:
+            chunks.append((None, code[start : i + 1].strip()))
+            start = i + 1
+        elif c == "\n" and depth == 0 and code[start:i].strip().startswith("#"):
+            # Preprocessor directives end at the line break
+            chunks.append((None, code[start:i].strip()))
+            start = i + 1
+    if code[start:].strip():
+        chunks.append((None, code[start:].strip()))
+    return [(name, text) for name, text in chunks if text]
+
+
+def compact_shader(source: str, max_tokens: int = 400) -> str:
+    """
+    Shrink GLSL source for use as context in a prompt.
+
+    Comments and redundant whitespace are always removed. If the code is still
+    over budget (estimated at ~4 characters per token), only global declarations,
+    main() and as many of the helper functions it calls as fit are kept, in
+    the order they are reached from main(). Helpers that are still called but
+    did not fit are replaced by prototypes and listed in an "omitted" comment.
+
+    Args:
+        source: GLSL source code
+        max_tokens: Approximate token budget for the result
+
+    Returns:
+        The compacted source
+    """
+    max_chars = max_tokens * 4
+
+    code = re.sub(r"/\*.*?\*/", "", source, flags=re.DOTALL)
+    code = re.sub(r"//[^\n]*", "", code)
+    lines = (re.sub(r"[ \t]+", " ", line).strip() for line in code.splitlines())
+    code = "\n".join(line for line in lines if line)
+    if len(code) <= max_chars:
+        return code
+
+    chunks = _split_top_level(code)
+    functions = {name: text for name, text in chunks if name}
+    if "main" not in functions:
+        return code
+
+    # Breadth-first from main(), so the most directly used helpers come first
+    keep = {"main"}
+    size = sum(len(text) for name, text in chunks if not name or name == "main")
+    queue = ["main"]
+    while queue:
+        body = functions[queue.pop(0)]
+        for called in dict.fromkeys(re.findall(r"\b(\w+)\s*\(", body)):
+            if called in functions and called not in keep:
+                if size + len(functions[called]) > max_chars:
+                    continue
+                keep.add(called)
+                size += len(functions[called])
+                queue.append(called)
+
+    # Dropped helpers that kept code still calls become prototypes, so the
+    # example stays valid GLSL and shows their signatures
+    called = set()
+    for name in keep:
+        called.update(re.findall(r"\b(\w+)\s*\(", functions[name]))
+    omitted = [
+        name for name, _ in chunks if name and name not in keep and name in called
+    ]
+
+    lines = []
+    if omitted:
+        lines.append(f"// omitted helper bodies: {', '.join(omitted)}")
+    for name, text in chunks:
+        if not name or name in keep:
+            lines.append(text)
+        elif name in omitted:
+            lines.append(text[: text.index("{")].strip() + ";")
+    return "\n".join(lines)
+
+
 def extractBlocks(text: str) -> Dict[str, str]:
     """
     Extract content from all tagged blocks in a string and return as a dictionary.
@@ -0,0 +1,63 @@
+"""Check that Population keeps its cached similarity matrix aligned on remove/subset"""
+
+from types import SimpleNamespace
+
+import torch
+
+from src.population import Population
+
+
+def make_population(n: int = 6, dim: int = 8) -> Population:
+    torch.manual_seed(0)
+    population = Population()
+    population.add_all(
+        [SimpleNamespace(id=str(i), embedding=torch.randn(dim)) for i in range(n)]
+    )
+    population.similarity_matrix()  # build the cache so remove() must update it
+    return population
+
+
+def assert_similarity_matches(population: Population):
+    embeddings = torch.stack([a.embedding for a in population.artifacts])
+    norm_emb = torch.nn.functional.normalize(embeddings.to(torch.float32), dim=1)
+    expected = torch.mm(norm_emb, norm_emb.t())
+
+    assert population._similarity.shape == expected.shape
+    assert population._embeddings.shape == norm_emb.shape
+    # Loose tolerance: the cache is half precision on GPU/MPS
+    assert torch.allclose(
+        population._similarity.cpu().float(), expected, atol=1e-2
+    )
+    assert torch.allclose(population._embeddings.cpu().float(), norm_emb, atol=1e-2)
+    for i, artifact in enumerate(population.artifacts):
+        assert population.id_to_index[artifact.id] == i
+        assert population.get(artifact.id) is artifact
+
+
+def test_remove_middle_and_last():
+    population = make_population()
+
+    population.remove(population.artifacts[2])
+    assert [a.id for a in population.artifacts] == ["0", "1", "5", "3", "4"]
+    assert_similarity_matches(population)
+
+    population.remove(population.artifacts[-1])
+    assert [a.id for a in population.artifacts] == ["0", "1", "5", "3"]
+    assert_similarity_matches(population)
+
+    # Adding after removals extends the cache in the new order
+    population.add(SimpleNamespace(id="6", embedding=torch.randn(8)))
+    assert_similarity_matches(population)
+
+
+def test_subset():
+    population = make_population()
+    subset = population.subset([4, 0, 2])
+    assert [a.id for a in subset.artifacts] == ["4", "0", "2"]
+    assert_similarity_matches(subset)
+
+
+if __name__ == "__main__":
+    test_remove_middle_and_last()
+    test_subset()
+    print("ok")
@@ -0,0 +1,73 @@
+"""Small checks for the pure text helpers in src.utils"""
+
+import os
+import re
+from types import SimpleNamespace
+
+from src.utils import compact_shader, streamUntilCode
+
+test_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_compact_shader_strips_comments():
+    source = """
+    precision mediump float;  // required
+    /* block
+       comment */
+    void main() {
+        gl_FragColor    = vec4(1.0);   // white
+    }
+    """
+    assert compact_shader(source) == (
+        "precision mediump float;\nvoid main() {\ngl_FragColor = vec4(1.0);\n}"
+    )
+
+
+def test_compact_shader_keeps_prototypes_for_dropped_helpers():
+    with open(os.path.join(test_dir, "test_shader.glsl")) as f:
+        source = f.read()
+    compact = compact_shader(source, max_tokens=400)
+
+    assert len(compact) < len(source)
+    assert compact.startswith("// omitted helper bodies: ")
+    assert "precision mediump float;" in compact
+    assert "void main()" in compact
+
+    # Every omitted helper is still declared, as a prototype without a body
+    omitted = compact.splitlines()[0].split(": ", 1)[1].split(", ")
+    for name in omitted:
+        assert re.search(rf"\b{name}\s*\([^)]*\)\s*;", compact), name
+        assert not re.search(rf"\b{name}\s*\([^)]*\)\s*\{{", compact), name
+
+
+def fake_stream(pieces):
+    for piece in pieces:
+        if piece is None:
+            # e.g. the trailing usage chunk, which has no choices
+            yield SimpleNamespace(choices=[])
+        else:
+            delta = SimpleNamespace(content=piece)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+
+def test_stream_until_code_stops_at_closing_fence():
+    # Fences split across chunks, and an empty chunk in between
+    stream = fake_stream(
+        ["Here:\n`", "``glsl\nvoid main() {}\n`", None, "``", "\nBye"]
+    )
+    assert streamUntilCode(stream) == "Here:\n```glsl\nvoid main() {}\n```"
+    # The rest is left unread for the caller
+    assert [c.choices[0].delta.content for c in stream] == ["\nBye"]
+
+
+def test_stream_until_code_without_code_reads_everything():
+    stream = fake_stream(["no ", "code", None])
+    assert streamUntilCode(stream) == "no code"
+
+
+if __name__ == "__main__":
+    test_compact_shader_strips_comments()
+    test_compact_shader_keeps_prototypes_for_dropped_helpers()
+    test_stream_until_code_stops_at_closing_fence()
+    test_stream_until_code_without_code_reads_everything()
+    print("ok")